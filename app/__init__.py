@@ -5,26 +5,82 @@ A modern web application for creating, formatting, and managing prompts.
 Features markdown editing, template management, and export functionality.
 """
 
+import atexit
 import logging
 import os
+import queue
+import sqlite3
+from typing import Optional
+import orjson
 from flask import Flask
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
-from logging.handlers import RotatingFileHandler
+from jinja2 import FileSystemBytecodeCache
+from logging.handlers import (
+    QueueHandler, QueueListener, RotatingFileHandler
+)
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Engine, make_url
 
 # Initialize extensions
 db = SQLAlchemy()
 
 
-def create_app() -> Flask:
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Enable WAL journaling and cheaper fsync policy on SQLite connections."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')  # 256MB
+    cursor.close()
+
+
+class ORJSONProvider(JSONProvider):
+    """
+    JSON provider backed by orjson.
+    
+    Serializes datetime objects natively, so models can hand them to
+    jsonify() without converting them to strings first.
+    """
+    
+    _options = orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=self._options).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=self._options),
+            mimetype='application/json'
+        )
+
+
+def create_app(config: Optional[dict] = None) -> Flask:
     """
     Application factory pattern for Flask app creation.
     
+    Parameters
+    ----------
+    config : dict, optional
+        Settings applied over the defaults before extensions and logging
+        are set up, e.g. a test database URI and TESTING
+    
     Returns
     -------
     Flask
         Configured Flask application instance
     """
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)
     
     # Configuration
     app.config['SECRET_KEY'] = os.environ.get(
@@ -34,8 +90,28 @@ def create_app() -> Flask:
         'DATABASE_URL', 'sqlite:///prompt_editor.db'
     )
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    if config is not None:
+        app.config.update(config)
+    database_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if (database_url.get_backend_name() == 'sqlite'
+            and database_url.database not in (None, '', ':memory:')):
+        # Reuse pooled connections across request threads; in-memory
+        # databases get a StaticPool from Flask-SQLAlchemy instead
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'pool_size': 10,
+            'pool_pre_ping': True,
+            'connect_args': {'check_same_thread': False}
+        }
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
     
+    # Persist compiled Jinja templates across restarts and worker processes.
+    # Without an explicit directory Jinja uses a per-user 0700 directory
+    # and refuses one owned by someone else, as cached bytecode is executed
+    jinja_cache_dir = os.environ.get('JINJA_CACHE_DIR')
+    if jinja_cache_dir:
+        os.makedirs(jinja_cache_dir, mode=0o700, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(jinja_cache_dir)
+    
     # Initialize extensions with app
     db.init_app(app)
     
@@ -57,7 +133,17 @@ def create_app() -> Flask:
             '[in %(pathname)s:%(lineno)d]'
         ))
         file_handler.setLevel(logging.INFO)
-        app.logger.addHandler(file_handler)
+        
+        # Hand records to a background thread so requests never block on
+        # log file writes
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(
+            log_queue, file_handler, respect_handler_level=True
+        )
+        listener.start()
+        atexit.register(listener.stop)
+        
+        app.logger.addHandler(QueueHandler(log_queue))
         app.logger.setLevel(logging.INFO)
         app.logger.info('Prompt Editor startup')
     
@@ -75,4 +161,44 @@ def init_db(app: Flask) -> None:
     """
     with app.app_context():
         db.create_all()
-        app.logger.info('Database initialized')
\ No newline at end of file
+        _upgrade_schema()
+        app.logger.info('Database initialized')
+
+
+def _upgrade_schema() -> None:
+    """
+    Add columns and indexes introduced after an existing database was
+    created.
+    
+    create_all only creates missing tables, so databases from earlier
+    versions are brought up to date here.
+    """
+    from app.models import _FTS_DDL, Folder, Template
+    
+    inspector = inspect(db.engine)
+    columns = {
+        column['name'] for column in inspector.get_columns('templates')
+    }
+    if 'content_length' not in columns:
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                'ALTER TABLE templates ADD COLUMN '
+                'content_length INTEGER NOT NULL DEFAULT 0'
+            ))
+            connection.execute(text(
+                'UPDATE templates SET content_length = length(content)'
+            ))
+    
+    # Listing indexes declared on the models; existing ones are skipped
+    with db.engine.begin() as connection:
+        for table in (Folder.__table__, Template.__table__):
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+    
+    # The full-text index is only created along with a new templates table;
+    # the DDL is idempotent and ends by indexing the existing rows
+    if (db.engine.dialect.name == 'sqlite'
+            and not inspector.has_table('templates_fts')):
+        with db.engine.begin() as connection:
+            for statement in _FTS_DDL:
+                connection.exec_driver_sql(statement)
\ No newline at end of file
@@ -5,11 +5,27 @@ This module defines SQLAlchemy models for storing prompt templates,
 folders, and their relationships in SQLite database.
 """
 
+import re
 from datetime import datetime
-from typing import List
-from sqlalchemy import Text
+from typing import List, Optional
+from sqlalchemy import DDL, Text, bindparam, event, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import joinedload
 from app import db
 
+# Shorter queries match nearly everything, so they are not run at all
+SEARCH_MIN_LENGTH = 2
+# Maximum number of templates returned by Template.search
+SEARCH_RESULT_LIMIT = 200
+
+# Word tokens extracted from user search input for FTS5 MATCH queries
+_FTS_TERM_RE = re.compile(r'\w+')
+
+_FTS_SEARCH_SQL = text(
+    'SELECT rowid FROM templates_fts WHERE templates_fts MATCH :q '
+    'ORDER BY rank LIMIT :limit'
+)
+
 
 class Folder(db.Model):
     """
@@ -34,7 +50,7 @@ class Folder(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     parent_id = db.Column(
-        db.Integer, db.ForeignKey('folders.id'), nullable=True
+        db.Integer, db.ForeignKey('folders.id'), nullable=True, index=True
     )
     created_at = db.Column(
         db.DateTime, default=datetime.utcnow, nullable=False
@@ -52,21 +68,41 @@ class Folder(db.Model):
         backref=db.backref('parent', remote_side=[id]),
         lazy='dynamic'
     )
-    templates = db.relationship('Template', backref='folder', lazy='dynamic')
+    templates = db.relationship(
+        'Template', back_populates='folder', lazy='dynamic'
+    )
     
     def __repr__(self) -> str:
         return f'<Folder {self.name}>'
     
-    def to_dict(self) -> dict:
-        """Convert folder to dictionary representation."""
+    def to_dict(
+        self,
+        children_count: Optional[int] = None,
+        templates_count: Optional[int] = None
+    ) -> dict:
+        """
+        Convert folder to dictionary representation.
+        
+        Parameters
+        ----------
+        children_count : int, optional
+            Precomputed number of child folders; queried when omitted
+        templates_count : int, optional
+            Precomputed number of templates; queried when omitted
+        """
+        if children_count is None:
+            children_count = self.children.count()
+        if templates_count is None:
+            templates_count = self.templates.count()
+        
         return {
             'id': self.id,
             'name': self.name,
             'parent_id': self.parent_id,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'children_count': self.children.count(),
-            'templates_count': self.templates.count()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'children_count': children_count,
+            'templates_count': templates_count
         }
 
 
@@ -82,6 +118,8 @@ class Template(db.Model):
         Template title (max 200 characters)
     content : str
         Markdown content of the prompt
+    content_length : int
+        Length of content, maintained on insert/update
     description : str, optional
         Optional description (max 500 characters)
     folder_id : int, optional
@@ -99,6 +137,7 @@ class Template(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(Text, nullable=False, default='')
+    content_length = db.Column(db.Integer, nullable=False, default=0)
     description = db.Column(db.String(500), nullable=True)
     folder_id = db.Column(
         db.Integer, db.ForeignKey('folders.id'), nullable=True
@@ -114,6 +153,17 @@ class Template(db.Model):
         nullable=False
     )
     
+    # Declared here rather than as a backref so the attribute exists before
+    # mappers are configured, e.g. for the module-level search statements
+    folder = db.relationship('Folder', back_populates='templates')
+    
+    # Indexes backing the list/filter/sort queries
+    __table_args__ = (
+        db.Index('ix_templates_updated_at', updated_at.desc()),
+        db.Index('ix_templates_folder_id', 'folder_id'),
+        db.Index('ix_templates_is_favorite', 'is_favorite'),
+    )
+    
     def __repr__(self) -> str:
         return f'<Template {self.title}>'
     
@@ -126,14 +176,55 @@ class Template(db.Model):
             'description': self.description,
             'folder_id': self.folder_id,
             'is_favorite': self.is_favorite,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'content_length': len(self.content),
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'content_length': self.content_length,
             'folder_name': self.folder.name if self.folder else None
         }
     
     @classmethod
-    def search(cls, query: str) -> List['Template']:
+    def summary_query(cls):
+        """
+        Build a query projecting only the columns needed to list templates.
+        
+        The content column is never loaded.
+        
+        Returns
+        -------
+        Query
+            Query yielding rows suitable for summary_to_dict()
+        """
+        return db.session.query(
+            cls.id, cls.title, cls.description, cls.folder_id,
+            cls.is_favorite, cls.created_at, cls.updated_at,
+            cls.content_length,
+            Folder.name.label('folder_name')
+        ).outerjoin(Folder, cls.folder_id == Folder.id)
+    
+    @staticmethod
+    def summary_to_dict(row) -> dict:
+        """Convert a summary_query() row to dictionary representation."""
+        return {
+            'id': row.id,
+            'title': row.title,
+            'description': row.description,
+            'folder_id': row.folder_id,
+            'is_favorite': row.is_favorite,
+            'created_at': row.created_at,
+            'updated_at': row.updated_at,
+            'content_length': row.content_length,
+            'folder_name': row.folder_name
+        }
+    
+    @classmethod
+    def _base_query(cls, load_folder: bool = True):
+        """Return the template query, eager-loading folders if requested."""
+        if load_folder:
+            return cls.query.options(joinedload(cls.folder))
+        return cls.query
+    
+    @classmethod
+    def search(cls, query: str, load_folder: bool = True) -> List['Template']:
         """
         Search templates by title or content.
         
@@ -141,39 +232,107 @@ class Template(db.Model):
         ----------
         query : str
             Search query string
+        load_folder : bool
+            Eager-load the parent folder in the same query
             
         Returns
         -------
         List[Template]
-            List of matching templates
+            List of matching templates, at most SEARCH_RESULT_LIMIT; empty
+            if the query is shorter than SEARCH_MIN_LENGTH
+        """
+        if not query or len(query.strip()) < SEARCH_MIN_LENGTH:
+            return []
+        
+        ids = cls._fts_search_ids(query)
+        if ids is not None:
+            matches = cls._base_query(load_folder).filter(cls.id.in_(ids))
+            by_id = {template.id: template for template in matches}
+            return [by_id[i] for i in ids if i in by_id]
+        
+        if load_folder:
+            statement = _LIKE_SEARCH_STMT_WITH_FOLDER
+        else:
+            statement = _LIKE_SEARCH_STMT
+        return db.session.execute(
+            statement, {'term': f'%{query}%'}
+        ).scalars().all()
+    
+    @classmethod
+    def search_ids(cls, query: str) -> List[int]:
         """
-        if not query:
+        Get IDs of templates matching query, without loading the rows.
+        
+        Parameters
+        ----------
+        query : str
+            Search query string
+        
+        Returns
+        -------
+        List[int]
+            Matching IDs in the same order as search(), at most
+            SEARCH_RESULT_LIMIT; empty if the query is shorter than
+            SEARCH_MIN_LENGTH
+        """
+        if not query or len(query.strip()) < SEARCH_MIN_LENGTH:
             return []
         
-        search_term = f'%{query}%'
-        return cls.query.filter(
-            db.or_(
-                cls.title.ilike(search_term),
-                cls.content.ilike(search_term),
-                cls.description.ilike(search_term)
+        ids = cls._fts_search_ids(query)
+        if ids is not None:
+            return ids
+        return db.session.execute(
+            _LIKE_SEARCH_IDS_STMT, {'term': f'%{query}%'}
+        ).scalars().all()
+    
+    @classmethod
+    def _fts_search_ids(cls, query: str) -> Optional[List[int]]:
+        """
+        Get IDs of templates matching query, ranked by the FTS5 index.
+        
+        Returns None when the index cannot be used (non-SQLite backend or
+        a database created before the index existed) so callers can fall
+        back to a LIKE scan.
+        """
+        if db.engine.dialect.name != 'sqlite':
+            return None
+        
+        terms = _FTS_TERM_RE.findall(query)
+        if not terms:
+            return None
+        
+        # Quote each term so user input can't inject FTS syntax
+        match = ' '.join(f'"{term}"*' for term in terms)
+        try:
+            result = db.session.execute(
+                _FTS_SEARCH_SQL, {'q': match, 'limit': SEARCH_RESULT_LIMIT}
             )
-        ).order_by(cls.updated_at.desc()).all()
+        except OperationalError:
+            return None
+        return result.scalars().all()
     
     @classmethod
-    def get_favorites(cls) -> List['Template']:
+    def get_favorites(cls, load_folder: bool = True) -> List['Template']:
         """
         Get all favorite templates.
         
+        Parameters
+        ----------
+        load_folder : bool
+            Eager-load the parent folder in the same query
+        
         Returns
         -------
         List[Template]
             List of favorite templates ordered by update date
         """
-        return cls.query.filter_by(is_favorite=True)\
+        return cls._base_query(load_folder).filter_by(is_favorite=True)\
                         .order_by(cls.updated_at.desc()).all()
     
     @classmethod
-    def get_recent(cls, limit: int = 10) -> List['Template']:
+    def get_recent(
+        cls, limit: int = 10, load_folder: bool = True
+    ) -> List['Template']:
         """
         Get recently updated templates.
         
@@ -181,13 +340,79 @@ class Template(db.Model):
         ----------
         limit : int
             Maximum number of templates to return
+        load_folder : bool
+            Eager-load the parent folder in the same query
             
         Returns
         -------
         List[Template]
             List of recent templates
         """
-        return cls.query.order_by(cls.updated_at.desc()).limit(limit).all()
+        return cls._base_query(load_folder)\
+                  .order_by(cls.updated_at.desc()).limit(limit).all()
+
+
+# Fallback search statements, built once and reused with a bound term
+_LIKE_SEARCH_CLAUSE = db.or_(
+    Template.title.ilike(bindparam('term')),
+    Template.content.ilike(bindparam('term')),
+    Template.description.ilike(bindparam('term'))
+)
+_LIKE_SEARCH_STMT = select(Template).where(_LIKE_SEARCH_CLAUSE)\
+    .order_by(Template.updated_at.desc()).limit(SEARCH_RESULT_LIMIT)
+_LIKE_SEARCH_IDS_STMT = select(Template.id).where(_LIKE_SEARCH_CLAUSE)\
+    .order_by(Template.updated_at.desc()).limit(SEARCH_RESULT_LIMIT)
+_LIKE_SEARCH_STMT_WITH_FOLDER = _LIKE_SEARCH_STMT.options(
+    joinedload(Template.folder)
+)
+
+
+@event.listens_for(Template, 'before_insert')
+@event.listens_for(Template, 'before_update')
+def _update_content_length(mapper, connection, target: Template) -> None:
+    """Keep the persisted content length in sync with content."""
+    target.content_length = len(target.content or '')
+
+
+# Full-text index over templates, kept in sync by triggers (SQLite only)
+_FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS templates_fts USING fts5(
+        title, content, description,
+        content='templates', content_rowid='id'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS templates_fts_ai
+    AFTER INSERT ON templates BEGIN
+        INSERT INTO templates_fts(rowid, title, content, description)
+        VALUES (new.id, new.title, new.content, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS templates_fts_ad
+    AFTER DELETE ON templates BEGIN
+        INSERT INTO templates_fts(
+            templates_fts, rowid, title, content, description
+        )
+        VALUES ('delete', old.id, old.title, old.content, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS templates_fts_au
+    AFTER UPDATE ON templates BEGIN
+        INSERT INTO templates_fts(
+            templates_fts, rowid, title, content, description
+        )
+        VALUES ('delete', old.id, old.title, old.content, old.description);
+        INSERT INTO templates_fts(rowid, title, content, description)
+        VALUES (new.id, new.title, new.content, new.description);
+    END""",
+    "INSERT INTO templates_fts(templates_fts) VALUES ('rebuild')",
+)
+
+for _statement in _FTS_DDL:
+    event.listen(
+        Template.__table__, 'after_create',
+        DDL(_statement).execute_if(dialect='sqlite')
+    )
+event.listen(
+    Template.__table__, 'before_drop',
+    DDL('DROP TABLE IF EXISTS templates_fts').execute_if(dialect='sqlite')
+)
 
 
 def init_default_data() -> None:
@@ -195,16 +420,10 @@ def init_default_data() -> None:
     # Create default root folder
     if not Folder.query.filter_by(name='Root', parent_id=None).first():
         root_folder = Folder(name='Root')
-        db.session.add(root_folder)
-        db.session.commit()
         
         # Create sample folders
-        samples_folder = Folder(
-            name='Sample Templates', parent_id=root_folder.id
-        )
-        work_folder = Folder(name='Work Templates', parent_id=root_folder.id)
-        db.session.add_all([samples_folder, work_folder])
-        db.session.commit()
+        samples_folder = Folder(name='Sample Templates', parent=root_folder)
+        work_folder = Folder(name='Work Templates', parent=root_folder)
         
         # Create sample template
         sample_template = Template(
@@ -228,8 +447,12 @@ This is a **sample template** to get you started.
 
 *Happy prompting!*""",
             description='A sample template demonstrating markdown features',
-            folder_id=samples_folder.id,
+            folder=samples_folder,
             is_favorite=True
         )
-        db.session.add(sample_template)
+        
+        # Everything is linked through relationships, so one commit suffices
+        db.session.add_all(
+            [root_folder, samples_folder, work_folder, sample_template]
+        )
         db.session.commit()
\ No newline at end of file
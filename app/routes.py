@@ -10,7 +10,12 @@ from flask import (
     flash, send_file, current_app
 )
 from werkzeug.exceptions import BadRequest, NotFound
-import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+import time
+from sqlalchemy import func, literal, select
+from sqlalchemy.orm import joinedload
+import io
 from app import db
 from app.models import Template, Folder, init_default_data
 from app.utils.export import export_to_markdown, export_to_text
@@ -22,6 +27,159 @@ from app.utils.filesystem import (
 # Create blueprint
 main = Blueprint('main', __name__)
 
+# Mirror template changes to disk off the request thread. A single worker
+# keeps writes for the same file in submission order.
+_disk_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix='prompt-editor-disk'
+)
+
+
+def _submit_disk_task(failure_msg: str, func, *args) -> Future:
+    """
+    Run a filesystem helper in the background, logging any failure.
+    
+    Parameters
+    ----------
+    failure_msg : str
+        Message prefix logged as a warning if the task raises
+    func : callable
+        Filesystem helper to run
+    *args
+        Positional arguments for func
+    
+    Returns
+    -------
+    Future
+        Future tracking the background task
+    """
+    logger = current_app.logger
+    
+    def log_failure(future: Future) -> None:
+        error = future.exception()
+        if error is not None:
+            logger.warning(f'{failure_msg}: {str(error)}')
+    
+    future = _disk_executor.submit(func, *args)
+    future.add_done_callback(log_failure)
+    return future
+
+
+# Set once default data has been checked, so index() skips the DB probe
+_seeded = False
+_seed_lock = threading.Lock()
+
+
+def _ensure_default_data() -> None:
+    """Seed default data on the first request if the database is empty."""
+    global _seeded
+    if _seeded:
+        return
+    
+    with _seed_lock:
+        if not _seeded:
+            if db.session.query(Folder.id).first() is None:
+                init_default_data()
+            _seeded = True
+
+
+# Serialized /api/folders payload, reused while the folder and template
+# tables are unchanged (see _listing_cache_key)
+FOLDERS_CACHE_TTL = 5.0
+_folders_cache = {}  # tree flag -> (key, body, expires_at)
+_folders_cache_lock = threading.Lock()
+
+# Serialized /api/templates payloads per query, on the same terms
+TEMPLATES_CACHE_TTL = 5.0
+TEMPLATES_CACHE_SIZE = 32
+_templates_cache = {}  # query params -> (key, body, expires_at)
+_templates_cache_lock = threading.Lock()
+
+
+def _listing_cache_key() -> tuple:
+    """
+    Get a cheap fingerprint of the data behind the folder and template
+    listings.
+    
+    Returns
+    -------
+    tuple
+        Latest update time and row count of folders and templates
+    """
+    row = db.session.execute(
+        select(
+            select(func.max(Folder.updated_at)).scalar_subquery(),
+            select(func.count(Folder.id)).scalar_subquery(),
+            select(func.max(Template.updated_at)).scalar_subquery(),
+            select(func.count(Template.id)).scalar_subquery()
+        )
+    ).one()
+    return tuple(row)
+
+
+def clear_listing_caches() -> None:
+    """Drop every cached /api/folders and /api/templates payload."""
+    with _folders_cache_lock:
+        _folders_cache.clear()
+    with _templates_cache_lock:
+        _templates_cache.clear()
+
+
+def _build_folder_tree(
+    children_counts: dict, templates_counts: dict
+) -> list:
+    """
+    Build the nested folder tree from a single recursive CTE query.
+    
+    Parameters
+    ----------
+    children_counts : dict
+        Number of child folders keyed by parent folder ID
+    templates_counts : dict
+        Number of templates keyed by folder ID
+    
+    Returns
+    -------
+    list
+        Root folder nodes, each with a nested 'children' list
+    """
+    tree = select(
+        Folder.id, Folder.name, Folder.parent_id,
+        Folder.created_at, Folder.updated_at,
+        literal(0).label('depth')
+    ).where(Folder.parent_id.is_(None)).cte('tree', recursive=True)
+    tree = tree.union_all(
+        select(
+            Folder.id, Folder.name, Folder.parent_id,
+            Folder.created_at, Folder.updated_at,
+            (tree.c.depth + 1).label('depth')
+        ).join(tree, Folder.parent_id == tree.c.id)
+    )
+    rows = db.session.execute(
+        select(tree).order_by(tree.c.depth, tree.c.id)
+    )
+    
+    # Rows arrive parents-first, so each parent node already exists
+    nodes = {}
+    roots = []
+    for row in rows:
+        node = {
+            'id': row.id,
+            'name': row.name,
+            'parent_id': row.parent_id,
+            'created_at': row.created_at,
+            'updated_at': row.updated_at,
+            'depth': row.depth,
+            'children_count': children_counts.get(row.id, 0),
+            'templates_count': templates_counts.get(row.id, 0),
+            'children': []
+        }
+        nodes[row.id] = node
+        if row.parent_id is None:
+            roots.append(node)
+        else:
+            nodes[row.parent_id]['children'].append(node)
+    return roots
+
 
 @main.route('/')
 def index():
@@ -34,8 +192,7 @@ def index():
         Rendered HTML template
     """
     # Initialize default data if database is empty
-    if Template.query.count() == 0:
-        init_default_data()
+    _ensure_default_data()
     
     # Get recent templates and folders for initial load
     recent_templates = Template.get_recent(limit=5)
@@ -58,9 +215,17 @@ def get_templates():
     folder_id : int, optional
         Filter by folder ID
     search : str, optional
-        Search query
+        Search query; at least 2 characters, results capped at 200
     favorites : bool, optional
         Filter favorites only
+    recent : bool, optional
+        Only the 10 most recently updated templates
+    fields : str, optional
+        'summary' to omit template content from the listing
+    limit : int, optional
+        Maximum number of templates to return; must not be negative
+    offset : int, optional
+        Number of templates to skip; must not be negative
     
     Returns
     -------
@@ -72,27 +237,90 @@ def get_templates():
         search_query = request.args.get('search', '').strip()
         favorites_only = request.args.get('favorites', '').lower() == 'true'
         recent_only = request.args.get('recent', '').lower() == 'true'
+        summary_only = request.args.get('fields', '').lower() == 'summary'
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', 0, type=int)
+        
+        if (limit is not None and limit < 0) or offset < 0:
+            raise BadRequest('limit and offset must not be negative')
+        if recent_only:
+            limit = min(limit, 10) if limit is not None else 10
+        
+        params = (
+            folder_id, search_query, favorites_only, summary_only,
+            limit, offset
+        )
+        cache_key = _listing_cache_key()
+        cached = _templates_cache.get(params)
+        if (cached is not None and cached[0] == cache_key
+                and cached[2] > time.monotonic()):
+            return current_app.response_class(
+                cached[1], mimetype='application/json'
+            )
         
-        query = Template.query
-        
-        if folder_id:
-            query = query.filter_by(folder_id=folder_id)
-        
-        if search_query:
+        if search_query and summary_only:
+            # Page the ranked IDs first, then project only summary columns
+            ids = Template.search_ids(search_query)[offset:]
+            if limit is not None:
+                ids = ids[:limit]
+            data = []
+            if ids:
+                rows = Template.summary_query().filter(Template.id.in_(ids))
+                by_id = {row.id: row for row in rows}
+                data = [
+                    Template.summary_to_dict(by_id[i])
+                    for i in ids if i in by_id
+                ]
+        elif search_query:
             templates = Template.search(search_query)
-        elif favorites_only:
-            templates = Template.get_favorites()
-        elif recent_only:
-            templates = query.order_by(Template.updated_at.desc()).limit(10).all()
+            if offset:
+                templates = templates[offset:]
+            if limit is not None:
+                templates = templates[:limit]
+            data = [template.to_dict() for template in templates]
         else:
-            templates = query.order_by(Template.updated_at.desc()).all()
+            if summary_only:
+                query = Template.summary_query()
+            else:
+                # Eager-load folders so to_dict() doesn't lazy-load per row
+                query = Template.query.options(joinedload(Template.folder))
+            
+            if folder_id:
+                query = query.filter(Template.folder_id == folder_id)
+            if favorites_only:
+                query = query.filter(Template.is_favorite.is_(True))
+            
+            query = query.order_by(Template.updated_at.desc())
+            if limit is not None:
+                query = query.limit(limit)
+            if offset:
+                query = query.offset(offset)
+            
+            if summary_only:
+                data = [Template.summary_to_dict(row) for row in query]
+            else:
+                data = [template.to_dict() for template in query]
         
-        return jsonify({
+        response = jsonify({
             'status': 'success',
-            'data': [template.to_dict() for template in templates],
-            'count': len(templates)
+            'data': data,
+            'count': len(data)
         })
+        
+        with _templates_cache_lock:
+            # Evict the oldest entry once the cache is full
+            if (params not in _templates_cache
+                    and len(_templates_cache) >= TEMPLATES_CACHE_SIZE):
+                del _templates_cache[next(iter(_templates_cache))]
+            _templates_cache[params] = (
+                cache_key,
+                response.get_data(),
+                time.monotonic() + TEMPLATES_CACHE_TTL
+            )
+        return response
     
+    except BadRequest as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f'Error fetching templates: {str(e)}')
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -135,11 +363,10 @@ def create_template():
         db.session.commit()
         
         # Save to file system
-        try:
-            save_template_to_disk(template.title, template.content)
-        except Exception as e:
-            msg = f'Failed to save template to disk: {str(e)}'
-            current_app.logger.warning(msg)
+        _submit_disk_task(
+            'Failed to save template to disk',
+            save_template_to_disk, template.title, template.content
+        )
         
         current_app.logger.info(f'Created template: {template.title}')
         return jsonify({
@@ -215,7 +442,9 @@ def update_template(template_id):
         Updated template data
     """
     try:
-        template = Template.query.get_or_404(template_id)
+        template = Template.query.options(
+            joinedload(Template.folder)
+        ).filter_by(id=template_id).first_or_404()
         data = request.get_json()
         
         if not data:
@@ -228,24 +457,30 @@ def update_template(template_id):
             template.content = data['content']
         if 'description' in data:
             template.description = data['description']
-        if 'folder_id' in data:
+        if 'folder_id' in data and data['folder_id'] != template.folder_id:
             template.folder_id = data['folder_id']
+            # Only the new folder's name needs loading
+            db.session.expire(template, ['folder'])
         if 'is_favorite' in data:
             template.is_favorite = data['is_favorite']
         
+        # Serialize after flush but before commit, so the commit's expiry
+        # doesn't force the row and its folder to be reloaded
+        db.session.flush()
+        template_data = template.to_dict()
         db.session.commit()
         
         # Update file on disk
-        try:
-            save_template_to_disk(template.title, template.content)
-        except Exception as e:
-            msg = f'Failed to update template on disk: {str(e)}'
-            current_app.logger.warning(msg)
+        _submit_disk_task(
+            'Failed to update template on disk',
+            save_template_to_disk,
+            template_data['title'], template_data['content']
+        )
         
-        current_app.logger.info(f'Updated template: {template.title}')
+        current_app.logger.info(f'Updated template: {template_data["title"]}')
         return jsonify({
             'status': 'success',
-            'data': template.to_dict()
+            'data': template_data
         })
     
     except NotFound:
@@ -283,13 +518,12 @@ def delete_template(template_id):
         db.session.commit()
         
         # Delete file from disk
-        try:
-            delete_template_from_disk(template.title)
-        except Exception as e:
-            msg = f'Failed to delete template from disk: {str(e)}'
-            current_app.logger.warning(msg)
+        _submit_disk_task(
+            'Failed to delete template from disk',
+            delete_template_from_disk, title
+        )
         
-        current_app.logger.info(f'Deleted template: {template.title}')
+        current_app.logger.info(f'Deleted template: {title}')
         return jsonify({
             'status': 'success',
             'message': f'Template "{title}" deleted successfully'
@@ -364,17 +598,57 @@ def get_folders():
     """
     Get all folders in hierarchical structure.
     
+    Query Parameters
+    ----------------
+    tree : bool, optional
+        Return root folders with nested 'children' instead of a flat list
+    
     Returns
     -------
     JSON
         List of folders with children
     """
     try:
-        folders = Folder.query.all()
-        return jsonify({
-            'status': 'success',
-            'data': [folder.to_dict() for folder in folders]
-        })
+        tree_view = request.args.get('tree', '').lower() == 'true'
+        
+        cache_key = _listing_cache_key()
+        cached = _folders_cache.get(tree_view)
+        if (cached is not None and cached[0] == cache_key
+                and cached[2] > time.monotonic()):
+            return current_app.response_class(
+                cached[1], mimetype='application/json'
+            )
+        
+        # Aggregate counts in two GROUP BY queries instead of two per folder
+        children_counts = dict(
+            db.session.query(Folder.parent_id, func.count())
+            .group_by(Folder.parent_id).all()
+        )
+        templates_counts = dict(
+            db.session.query(Template.folder_id, func.count())
+            .group_by(Template.folder_id).all()
+        )
+        
+        if tree_view:
+            data = _build_folder_tree(children_counts, templates_counts)
+        else:
+            data = [
+                folder.to_dict(
+                    children_count=children_counts.get(folder.id, 0),
+                    templates_count=templates_counts.get(folder.id, 0)
+                )
+                for folder in Folder.query.all()
+            ]
+        
+        response = jsonify({'status': 'success', 'data': data})
+        
+        with _folders_cache_lock:
+            _folders_cache[tree_view] = (
+                cache_key,
+                response.get_data(),
+                time.monotonic() + FOLDERS_CACHE_TTL
+            )
+        return response
     
     except Exception as e:
         current_app.logger.error(f'Error fetching folders: {str(e)}')
@@ -462,22 +736,23 @@ def update_folder(folder_id):
             if data['parent_id'] == folder_id:
                 raise BadRequest('Folder cannot be its own parent')
             
-            # Check if new parent would create circular dependency
-            def would_create_circle(check_folder_id, target_parent_id):
-                if check_folder_id == target_parent_id:
-                    return True
-                parent = Folder.query.get(target_parent_id)
-                if parent and parent.parent_id:
-                    return would_create_circle(
-                        check_folder_id, parent.parent_id
-                    )
-                return False
-            
-            if (data['parent_id'] and
-                    would_create_circle(folder_id, data['parent_id'])):
-                raise BadRequest(
-                    'This would create a circular folder dependency'
+            # Check if new parent would create circular dependency by
+            # fetching all ancestors of the new parent in a single query
+            if data['parent_id']:
+                ancestors = db.session.query(
+                    Folder.id, Folder.parent_id
+                ).filter(Folder.id == data['parent_id']).cte(recursive=True)
+                ancestors = ancestors.union(
+                    db.session.query(Folder.id, Folder.parent_id)
+                    .join(ancestors, Folder.id == ancestors.c.parent_id)
                 )
+                ancestor_ids = set(
+                    db.session.execute(select(ancestors.c.id)).scalars()
+                )
+                if folder_id in ancestor_ids:
+                    raise BadRequest(
+                        'This would create a circular folder dependency'
+                    )
             
             folder.parent_id = data['parent_id']
         
@@ -654,18 +929,13 @@ def export_markdown(template_id):
     try:
         template = Template.query.get_or_404(template_id)
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(
-            mode='w', suffix='.md', delete=False, encoding='utf-8'
-        ) as tmp_file:
-            content = export_to_markdown(template)
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
+        # Serve from memory instead of round-tripping through a temp file
+        buffer = io.BytesIO(export_to_markdown(template).encode('utf-8'))
         
         filename = f"{template.title.replace(' ', '_')}.md"
         
         return send_file(
-            tmp_path,
+            buffer,
             as_attachment=True,
             download_name=filename,
             mimetype='text/markdown'
@@ -698,18 +968,13 @@ def export_text(template_id):
     try:
         template = Template.query.get_or_404(template_id)
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(
-            mode='w', suffix='.txt', delete=False, encoding='utf-8'
-        ) as tmp_file:
-            content = export_to_text(template)
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
+        # Serve from memory instead of round-tripping through a temp file
+        buffer = io.BytesIO(export_to_text(template).encode('utf-8'))
         
         filename = f"{template.title.replace(' ', '_')}.txt"
         
         return send_file(
-            tmp_path,
+            buffer,
             as_attachment=True,
             download_name=filename,
             mimetype='text/plain'
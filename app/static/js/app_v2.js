@@ -1263,7 +1263,7 @@ export class PromptEditorApp extends EventTarget {
         try {
             this.logger.debug('Loading recent templates for sidebar...');
             
-            const response = await fetch('/api/templates?recent=true');
+            const response = await fetch('/api/templates?recent=true&fields=summary');
             if (!response.ok) return;
             
             const data = await response.json();
@@ -1301,7 +1301,7 @@ export class PromptEditorApp extends EventTarget {
         try {
             this.logger.debug('Loading favorite templates for sidebar...');
             
-            const response = await fetch('/api/templates?favorites=true');
+            const response = await fetch('/api/templates?favorites=true&fields=summary');
             if (!response.ok) return;
             
             const data = await response.json();
@@ -1351,7 +1351,7 @@ export class PromptEditorApp extends EventTarget {
             </div>
             <p class="text-xs text-gray-500 dark:text-gray-400 mt-1">${new Date(template.created_at).toLocaleDateString()}</p>
             <div class="text-xs text-gray-400 dark:text-gray-500 mt-1">
-                ${template.content ? template.content.length : 0} caractères
+                ${template.content_length || 0} caractères
             </div>
         `;
         
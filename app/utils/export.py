@@ -6,12 +6,108 @@ including Markdown and plain text with proper formatting.
 """
 
 import re
+from collections import Counter
 from datetime import datetime
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from app.models import Template
 
+# Inline markdown spans; each alternative captures the text to keep
+_INLINE_PATTERN = (
+    r'\*\*\*(?P<bold_italic>.+?)\*\*\*'
+    r'|\*\*(?P<bold>.+?)\*\*'
+    r'|\*(?P<italic>.+?)\*'
+    r'|__(?P<bold_alt>.+?)__'
+    r'|_(?P<italic_alt>.+?)_'
+    r'|`(?P<code>.+?)`'
+    r'|\[(?P<link_text>[^\]]+)\]\((?P<link_url>[^)]+)\)'
+)
+_RE_INLINE = re.compile(_INLINE_PATTERN)
+
+# Line-level constructs followed by inline spans, so markdown_to_text
+# converts everything in a single sweep
+_RE_MARKDOWN = re.compile(
+    r'^#{1,6}\s*(?P<header>.+)$'
+    r'|(?P<rule>^[\-\*_]{3,}$)'
+    r'|^>\s*(?P<quote>.+)$'
+    r'|^[\*\-\+]\s+(?P<list_item>.+)$'
+    r'|' + _INLINE_PATTERN,
+    re.MULTILINE
+)
+
+# Content that already opens with a header, checked without copying it
+_RE_LEADING_HASH = re.compile(r'\s*#')
+
+# Fenced code block; an unclosed fence runs to the end of the text
+_RE_FENCE = re.compile(
+    r'^```[^\n]*\n(?P<code>.*?)(?:^```[ \t]*$|\Z)',
+    re.MULTILINE | re.DOTALL
+)
+
+# Characters every markdown construct handled here starts with
+_RE_MARKDOWN_CHARS = re.compile(r'[#*_`\[>+\-]')
+
+_RE_MULTI_NL = re.compile(r'\n\s*\n\s*\n')
+
+# Filename cleanup: invalid characters map to underscores, runs collapse
+_INVALID_FN_TABLE = str.maketrans(dict.fromkeys('<>:"/\\|?*', '_'))
+_RE_MULTI_USCORE = re.compile(r'_{2,}')
+
+# A line holding anything besides whitespace, matched once per line
+_RE_NON_EMPTY_LINE = re.compile(r'^[^\S\n]*\S', re.MULTILINE)
+
+# Statistics patterns: one alternation whose group names are the counted
+# element kinds, so a single scan tallies them all. Spans stop at line
+# ends so a stray marker can't swallow the elements on following lines.
+# Matched against UTF-8 bytes, which the regex engine scans faster.
+_RE_STATS = re.compile(
+    rb'(?P<headers>^#{1,6}\s)'
+    rb'|(?P<lists>^[\*\-\+\d+\.]\s)'
+    rb'|(?P<bold_text>\*\*[^*\n]+\*\*)'
+    rb'|(?P<italic_text>\*[^*\n]+\*)'
+    rb'|(?P<fences>```)'
+    rb'|(?P<inline_code>`[^`\n]+`)'
+    rb'|(?P<links>\[[^\]\n]+\]\([^)\n]+\))',
+    re.MULTILINE
+)
+
+# Export headers, filled per template with str.format_map
+_MARKDOWN_HEADER = """---
+title: "{title}"
+description: "{description}"
+created: {created}
+updated: {updated}
+folder: "{folder}"
+favorite: {favorite}
+exported: {exported}
+---
+
+"""
+
+_TEXT_HEADER = """PROMPT TEMPLATE
+===============
+
+Title: {title}
+Description: {description}
+Created: {created}
+Updated: {updated}
+Folder: {folder}
+Favorite: {favorite}
+Exported: {exported}
+
+""" + "=" * 50 + """
+
+"""
+
+
+def _format_datetime(dt: datetime) -> str:
+    """Format a datetime as 'YYYY-MM-DD HH:MM:SS' without strftime."""
+    return (
+        f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} "
+        f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+    )
+
 
 def export_to_markdown(template: 'Template') -> str:
     """
@@ -28,21 +124,19 @@ def export_to_markdown(template: 'Template') -> str:
         Formatted Markdown content with metadata header
     """
     # Create metadata header
-    metadata = f"""---
-title: "{template.title}"
-description: "{template.description or ''}"
-created: {template.created_at.strftime('%Y-%m-%d %H:%M:%S')}
-updated: {template.updated_at.strftime('%Y-%m-%d %H:%M:%S')}
-folder: "{template.folder.name if template.folder else 'Root'}"
-favorite: {str(template.is_favorite).lower()}
-exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
----
-
-"""
+    metadata = _MARKDOWN_HEADER.format_map({
+        'title': template.title,
+        'description': template.description or '',
+        'created': _format_datetime(template.created_at),
+        'updated': _format_datetime(template.updated_at),
+        'folder': template.folder.name if template.folder else 'Root',
+        'favorite': 'true' if template.is_favorite else 'false',
+        'exported': _format_datetime(datetime.now())
+    })
     
     # Add title if not already in content
     content = template.content
-    if not content.strip().startswith('#'):
+    if not _RE_LEADING_HASH.match(content):
         content = f"# {template.title}\n\n{content}"
     
     return metadata + content
@@ -63,20 +157,15 @@ def export_to_text(template: 'Template') -> str:
         Plain text content with metadata header
     """
     # Create text metadata header
-    header = f"""PROMPT TEMPLATE
-===============
-
-Title: {template.title}
-Description: {template.description or 'No description'}
-Created: {template.created_at.strftime('%Y-%m-%d %H:%M:%S')}
-Updated: {template.updated_at.strftime('%Y-%m-%d %H:%M:%S')}
-Folder: {template.folder.name if template.folder else 'Root'}
-Favorite: {'Yes' if template.is_favorite else 'No'}
-Exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-{"="*50}
-
-"""
+    header = _TEXT_HEADER.format_map({
+        'title': template.title,
+        'description': template.description or 'No description',
+        'created': _format_datetime(template.created_at),
+        'updated': _format_datetime(template.updated_at),
+        'folder': template.folder.name if template.folder else 'Root',
+        'favorite': 'Yes' if template.is_favorite else 'No',
+        'exported': _format_datetime(datetime.now())
+    })
     
     # Convert markdown to plain text
     content = markdown_to_text(template.content)
@@ -101,52 +190,19 @@ def markdown_to_text(markdown_content: str) -> str:
     if not markdown_content:
         return ""
     
-    text = markdown_content
-    
-    # Remove headers (convert to uppercase)
-    text = re.sub(
-        r'^#{1,6}\s*(.+)$',
-        lambda m: m.group(1).upper(),
-        text,
-        flags=re.MULTILINE
-    )
-    
-    # Remove bold/italic formatting
-    text = re.sub(r'\*\*\*(.+?)\*\*\*', r'\1', text)  # Bold italic
-    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)      # Bold
-    text = re.sub(r'\*(.+?)\*', r'\1', text)          # Italic
-    text = re.sub(r'__(.+?)__', r'\1', text)          # Bold alt
-    text = re.sub(r'_(.+?)_', r'\1', text)            # Italic alt
-    
-    # Remove inline code formatting
-    text = re.sub(r'`(.+?)`', r'\1', text)
+    # Plain text has nothing to convert; just tidy the blank lines
+    if not _RE_MARKDOWN_CHARS.search(markdown_content):
+        return _RE_MULTI_NL.sub('\n\n', markdown_content).strip()
     
     # Convert code blocks to indented text
-    text = re.sub(r'^```.*?\n', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^```$', '', text, flags=re.MULTILINE)
-    
-    # Remove link formatting but keep URL
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'\1 (\2)', text)
-    
-    # Convert blockquotes to simple format
-    text = re.sub(r'^>\s*(.+)$', r'"\1"', text, flags=re.MULTILINE)
-    
-    # Convert unordered lists
-    text = re.sub(r'^[\*\-\+]\s+(.+)$', r'• \1', text, flags=re.MULTILINE)
-    
-    # Convert ordered lists (keep numbering)
-    text = re.sub(
-        r'^\d+\.\s+(.+)$',
-        lambda m: f'{m.group(0)}',
-        text,
-        flags=re.MULTILINE
-    )
+    text = _RE_FENCE.sub(_indent_code, markdown_content)
     
-    # Remove horizontal rules
-    text = re.sub(r'^[\-\*_]{3,}$', '', text, flags=re.MULTILINE)
+    # Convert headers, blockquotes, lists, rules, emphasis, inline code
+    # and links in one pass
+    text = _RE_MARKDOWN.sub(_replace_markdown, text)
     
     # Clean up multiple empty lines
-    text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
+    text = _RE_MULTI_NL.sub('\n\n', text)
     
     # Remove leading/trailing whitespace
     text = text.strip()
@@ -154,6 +210,39 @@ def markdown_to_text(markdown_content: str) -> str:
     return text
 
 
+def _indent_code(match: 're.Match') -> str:
+    """Return the body of a fenced code block indented by four spaces."""
+    return '\n'.join(
+        f'    {line}' if line else line
+        for line in match['code'].splitlines()
+    )
+
+
+def _strip_inline(text: str) -> str:
+    """Remove inline markdown formatting from a span of text."""
+    return _RE_INLINE.sub(_replace_markdown, text)
+
+
+def _replace_markdown(match: 're.Match') -> str:
+    """Return the plain text replacement for one markdown construct."""
+    kind = match.lastgroup
+    
+    if kind == 'header':
+        return _strip_inline(match['header']).upper()
+    if kind == 'rule':
+        return ''
+    if kind == 'quote':
+        return f'"{_strip_inline(match["quote"])}"'
+    if kind == 'list_item':
+        return f'• {_strip_inline(match["list_item"])}'
+    if kind == 'link_url':
+        # Keep the URL after the link text
+        return f'{_strip_inline(match["link_text"])} ({match["link_url"]})'
+    
+    # Emphasis and inline code: keep the inner text
+    return _strip_inline(match[kind])
+
+
 def sanitize_filename(filename: str) -> str:
     """
     Sanitize filename by removing invalid characters.
@@ -169,23 +258,15 @@ def sanitize_filename(filename: str) -> str:
         Sanitized filename safe for filesystem
     """
     # Remove or replace invalid characters
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-    
-    # Remove multiple underscores
-    filename = re.sub(r'_{2,}', '_', filename)
-    
-    # Remove leading/trailing underscores and spaces
-    filename = filename.strip('_ ')
-    
-    # Ensure filename is not empty
-    if not filename:
-        filename = 'untitled'
+    filename = filename.translate(_INVALID_FN_TABLE)
     
-    # Limit length
-    if len(filename) > 100:
-        filename = filename[:100]
+    # Remove multiple underscores; most names have none, so skip the regex
+    if '__' in filename:
+        filename = _RE_MULTI_USCORE.sub('_', filename)
     
-    return filename
+    # Remove leading/trailing underscores and spaces, ensure the name is
+    # not empty and limit its length (slicing a short name is a no-op)
+    return filename.strip('_ ')[:100] or 'untitled'
 
 
 def get_export_stats(template: 'Template') -> dict:
@@ -205,23 +286,17 @@ def get_export_stats(template: 'Template') -> dict:
     content = template.content or ""
     
     # Count lines
-    lines = content.split('\n')
-    total_lines = len(lines)
-    non_empty_lines = len([line for line in lines if line.strip()])
+    total_lines = content.count('\n') + 1
+    non_empty_lines = sum(1 for _ in _RE_NON_EMPTY_LINE.finditer(content))
     
     # Count words and characters
     words = len(content.split())
     characters = len(content)
-    characters_no_spaces = len(content.replace(' ', ''))
+    characters_no_spaces = characters - content.count(' ')
     
     # Count markdown elements
-    headers = len(re.findall(r'^#{1,6}\s', content, re.MULTILINE))
-    bold_text = len(re.findall(r'\*\*[^*]+\*\*', content))
-    italic_text = len(re.findall(r'\*[^*]+\*', content))
-    code_blocks = len(re.findall(r'```', content)) // 2
-    inline_code = len(re.findall(r'`[^`]+`', content))
-    links = len(re.findall(r'\[([^\]]+)\]\(([^)]+)\)', content))
-    lists = len(re.findall(r'^[\*\-\+\d+\.]\s', content, re.MULTILINE))
+    encoded = content.encode('utf-8', 'surrogatepass')
+    counts = Counter(match.lastgroup for match in _RE_STATS.finditer(encoded))
     
     return {
         'total_lines': total_lines,
@@ -229,12 +304,12 @@ def get_export_stats(template: 'Template') -> dict:
         'words': words,
         'characters': characters,
         'characters_no_spaces': characters_no_spaces,
-        'headers': headers,
-        'bold_text': bold_text,
-        'italic_text': italic_text,
-        'code_blocks': code_blocks,
-        'inline_code': inline_code,
-        'links': links,
-        'lists': lists,
+        'headers': counts['headers'],
+        'bold_text': counts['bold_text'],
+        'italic_text': counts['italic_text'],
+        'code_blocks': counts['fences'] // 2,
+        'inline_code': counts['inline_code'],
+        'links': counts['links'],
+        'lists': counts['lists'],
         'estimated_reading_time': max(1, words // 200)  # ~200 words per minute
     }
\ No newline at end of file
@@ -5,17 +5,47 @@ This module handles synchronization between database templates
 and the file system storage in the user's directory.
 """
 
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 import re
+from sqlalchemy import select
+from app import db
 
+# Templates fetched per round trip, and written per window, during sync
+SYNC_BATCH_SIZE = 500
+# Threads writing template files concurrently during sync
+SYNC_WRITE_WORKERS = 16
 
+# Raw descriptor writes for template files, where the platform has writev
+_HAS_WRITEV = hasattr(os, 'writev')
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+
+# Characters not allowed in file and folder names
+_INVALID_FN_TABLE = str.maketrans(dict.fromkeys('<>:"/\\|?*', '_'))
+_RE_MULTI_USCORE = re.compile(r'_{2,}')
+
+# Device names Windows reserves regardless of extension
+_RESERVED_NAMES = frozenset((
+    'con', 'prn', 'aux', 'nul', 'com1', 'com2', 'com3', 'com4', 'com5',
+    'com6', 'com7', 'com8', 'com9', 'lpt1', 'lpt2', 'lpt3', 'lpt4',
+    'lpt5', 'lpt6', 'lpt7', 'lpt8', 'lpt9'
+))
+
+
+@lru_cache(maxsize=None)
 def get_user_templates_dir() -> Path:
     """
     Get the user's templates directory path.
     
+    The directory is resolved and created on the first call only; use
+    get_user_templates_dir.cache_clear() to pick up a changed home.
+    
     Returns
     -------
     Path
@@ -27,6 +57,15 @@ def get_user_templates_dir() -> Path:
     return templates_dir
 
 
+@lru_cache(maxsize=4096)
+def _sanitize_name(name: str) -> str:
+    """Replace invalid characters and trim; empty if nothing is left."""
+    sanitized = name.translate(_INVALID_FN_TABLE)
+    if '__' in sanitized:
+        sanitized = _RE_MULTI_USCORE.sub('_', sanitized)
+    return sanitized.strip('_ .')
+
+
 def sanitize_folder_name(name: str) -> str:
     """
     Sanitize folder name for file system compatibility.
@@ -42,17 +81,11 @@ def sanitize_folder_name(name: str) -> str:
         Sanitized folder name
     """
     # Remove or replace invalid characters for folder names
-    sanitized = re.sub(r'[<>:"/\\|?*]', '_', name)
-    sanitized = re.sub(r'_{2,}', '_', sanitized)
-    sanitized = sanitized.strip('_ .')
-    
-    # Ensure it's not empty and not a reserved name
-    reserved_names = [
-        'con', 'prn', 'aux', 'nul', 'com1', 'com2', 'com3', 'com4', 'com5',
-        'com6', 'com7', 'com8', 'com9', 'lpt1', 'lpt2', 'lpt3', 'lpt4',
-        'lpt5', 'lpt6', 'lpt7', 'lpt8', 'lpt9'
-    ]
-    if not sanitized or sanitized.lower() in reserved_names:
+    sanitized = _sanitize_name(name)
+    
+    # Ensure it's not empty and not a reserved name; the timestamped
+    # fallback stays outside the cache
+    if not sanitized or sanitized.lower() in _RESERVED_NAMES:
         sanitized = f"folder_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     
     return sanitized
@@ -73,9 +106,7 @@ def sanitize_template_filename(title: str) -> str:
         Sanitized filename (without extension)
     """
     # Similar to folder name but for files
-    sanitized = re.sub(r'[<>:"/\\|?*]', '_', title)
-    sanitized = re.sub(r'_{2,}', '_', sanitized)
-    sanitized = sanitized.strip('_ .')
+    sanitized = _sanitize_name(title)
     
     if not sanitized:
         sanitized = f"template_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -155,23 +186,112 @@ def save_template_to_disk(
     if folder_path is None:
         folder_path = get_user_templates_dir()
     
-    filename = sanitize_template_filename(title) + ".md"
-    file_path = folder_path / filename
+    file_path = get_template_file_path(title, folder_path)
+    write_template_files([(file_path, title, content)])
+    
+    return file_path
+
+
+def get_template_file_path(title: str, folder_path: Path) -> Path:
+    """
+    Get the Markdown file path for a template title.
+    
+    Parameters
+    ----------
+    title : str
+        Template title
+    folder_path : Path
+        Folder containing the template file
+        
+    Returns
+    -------
+    Path
+        Path to the template file
+    """
+    return folder_path / (sanitize_template_filename(title) + ".md")
+
+
+def write_template_files(
+    files: Iterable[Tuple[Path, str, str]], max_workers: int = 1
+) -> None:
+    """
+    Write a batch of templates to disk as Markdown files.
+    
+    Parameters
+    ----------
+    files : Iterable[Tuple[Path, str, str]]
+        (file_path, title, content) triples; parent folders must exist.
+        When several share a path, the last one is what ends up on disk
+    max_workers : int
+        Number of threads issuing writes concurrently; 1 writes in order
+        on the calling thread
+    
+    Notes
+    -----
+    With several workers, files are taken SYNC_BATCH_SIZE at a time and
+    each window is written completely before the next is read, so a
+    streamed iterable is never held in memory all at once.
+    """
+    # One timestamp for the whole batch
+    created = datetime.now().isoformat()
     
-    # Add metadata header
-    metadata = f"""---
+    def write(file: Tuple[Path, str, str]) -> None:
+        file_path, title, content = file
+        # Add metadata header
+        metadata = f"""---
 title: {title}
-created: {datetime.now().isoformat()}
+created: {created}
 ---
 
 """
+        
+        _write_file(
+            file_path, metadata.encode('utf-8'), content.encode('utf-8')
+        )
     
-    full_content = metadata + content
+    if max_workers <= 1:
+        for file in files:
+            write(file)
+        return
     
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(full_content)
+    files = iter(files)
+    # Writes are I/O bound, so threads keep several in flight at once
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            # Titles are not unique and sanitizing can map different titles
+            # to one path; keep only the last file per path so no two
+            # threads write the same file. Windows run one after another,
+            # so a later window still overwrites an earlier one.
+            latest = {
+                file[0]: file for file in islice(files, SYNC_BATCH_SIZE)
+            }
+            if not latest:
+                break
+            for _ in executor.map(write, latest.values()):
+                pass
+
+
+def _write_file(file_path: Path, header: bytes, body: bytes) -> None:
+    """
+    Write header and body to a file without concatenating them.
     
-    return file_path
+    Uses a single writev on a raw descriptor where available, skipping the
+    text I/O layer; platforms without writev (Windows) use write_bytes.
+    """
+    if not _HAS_WRITEV:
+        file_path.write_bytes(header + body)
+        return
+    
+    fd = os.open(file_path, _WRITE_FLAGS, 0o644)
+    try:
+        written = os.writev(fd, (header, body))
+        if written < len(header) + len(body):
+            # writev may stop short; finish the rest with plain writes
+            rest = memoryview(header + body)[written:]
+            while rest:
+                rest = rest[os.write(fd, rest):]
+    finally:
+        os.close(fd)
 
 
 def delete_template_from_disk(
@@ -195,8 +315,7 @@ def delete_template_from_disk(
     if folder_path is None:
         folder_path = get_user_templates_dir()
     
-    filename = sanitize_template_filename(title) + ".md"
-    file_path = folder_path / filename
+    file_path = get_template_file_path(title, folder_path)
     
     if file_path.exists():
         file_path.unlink()
@@ -237,32 +356,40 @@ def sync_database_to_filesystem():
     """
     from app.models import Template, Folder
     
-    # Get all folders and create directory structure
-    folders = Folder.query.all()
+    # Roots first, then by id, so a parent's directory normally exists by
+    # the time its children are reached and one pass suffices
+    folders = Folder.query.order_by(
+        Folder.parent_id.is_(None).desc(), Folder.id
+    ).all()
     folder_paths = {}
     
-    # Create root folders first
     for folder in folders:
         if folder.parent_id is None:
-            folder_path = create_folder_on_disk(folder.name)
-            folder_paths[folder.id] = folder_path
+            folder_paths[folder.id] = create_folder_on_disk(folder.name)
+        elif folder.parent_id in folder_paths:
+            folder_paths[folder.id] = create_folder_on_disk(
+                folder.name, folder_paths[folder.parent_id]
+            )
     
-    # Create child folders
-    for folder in folders:
-        if folder.parent_id is not None and folder.parent_id in folder_paths:
-            parent_path = folder_paths[folder.parent_id]
-            folder_path = create_folder_on_disk(folder.name, parent_path)
-            folder_paths[folder.id] = folder_path
-    
-    # Save all templates to their respective folders
-    templates = Template.query.all()
-    for template in templates:
-        if template.folder_id and template.folder_id in folder_paths:
-            folder_path = folder_paths[template.folder_id]
-        else:
-            folder_path = get_user_templates_dir()
-        
-        save_template_to_disk(template.title, template.content, folder_path)
+    root_path = get_user_templates_dir()
+    
+    # Stream template rows and write each file as its own task, so small
+    # syncs get as much write concurrency as large ones; the writer takes
+    # one batch of rows at a time
+    # Id order makes the newest of several same-named templates win
+    statement = select(
+        Template.title, Template.content, Template.folder_id
+    ).order_by(Template.id).execution_options(yield_per=SYNC_BATCH_SIZE)
+    files = (
+        (
+            get_template_file_path(
+                title, folder_paths.get(folder_id, root_path)
+            ),
+            title, content
+        )
+        for title, content, folder_id in db.session.execute(statement)
+    )
+    write_template_files(files, max_workers=SYNC_WRITE_WORKERS)
 
 
 def get_folder_structure() -> dict:
@@ -276,28 +403,37 @@ def get_folder_structure() -> dict:
     """
     templates_dir = get_user_templates_dir()
     
-    def scan_directory(path: Path) -> dict:
-        structure = {
-            'name': path.name,
-            'path': str(path),
-            'folders': [],
-            'templates': []
-        }
-        
-        if path.is_dir():
-            for item in path.iterdir():
-                if item.is_dir():
-                    structure['folders'].append(scan_directory(item))
-                elif item.suffix == '.md':
-                    structure['templates'].append({
-                        'name': item.stem,
-                        'path': str(item),
-                        'modified': datetime.fromtimestamp(item.stat().st_mtime)
-                    })
-        
+    def new_node(name: str, path: str) -> dict:
+        return {'name': name, 'path': path, 'folders': [], 'templates': []}
+    
+    structure = new_node(templates_dir.name, str(templates_dir))
+    # The path is cached, so the directory may have been removed since
+    if not templates_dir.is_dir():
         return structure
     
-    return scan_directory(templates_dir)
+    # Walk with an explicit stack; scandir entries cache the type and stat
+    # data from the directory read, avoiding a stat call per Path
+    stack = [(str(templates_dir), structure)]
+    while stack:
+        path, node = stack.pop()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                # Symlinked directories are not descended into, so a link
+                # loop can't keep the walk going
+                if entry.is_dir(follow_symlinks=False):
+                    child = new_node(entry.name, entry.path)
+                    node['folders'].append(child)
+                    stack.append((entry.path, child))
+                elif entry.name.endswith('.md'):
+                    node['templates'].append({
+                        'name': entry.name[:-3],
+                        'path': entry.path,
+                        'modified': datetime.fromtimestamp(
+                            entry.stat().st_mtime
+                        )
+                    })
+    
+    return structure
 
 
 def sync_filesystem_to_database():
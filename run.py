@@ -5,16 +5,15 @@ This script creates and runs the Flask application instance.
 For development purposes only - use WSGI server for production.
 """
 
-import os
 from app import create_app, init_db
 
 # Create Flask application instance
 app = create_app()
 
 if __name__ == '__main__':
-    # Initialize database on first run
-    if not os.path.exists('prompt_editor.db'):
-        init_db(app)
+    # Create any missing tables; create_all skips existing ones, so this is
+    # safe on every start and needs no separate file-existence check
+    init_db(app)
     
     # Run development server
     app.run(
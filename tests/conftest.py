@@ -3,20 +3,62 @@ Test configuration for Prompt Editor v2.0
 
 This module provides pytest configuration and shared fixtures
 for testing the Flask application.
+
+The application, engine and schema are created once per session. Each
+test runs inside an outer transaction that is rolled back afterwards,
+while the application's own commits only release SAVEPOINTs.
 """
 
+import logging
 import pytest
 import tempfile
 import os
+from unittest import mock
+from sqlalchemy import event, insert
+from sqlalchemy.orm import scoped_session, sessionmaker
 from app import create_app, db
 from app.models import Template, Folder, init_default_data
+from app.utils.filesystem import get_user_templates_dir
 
 
-@pytest.fixture
-def app():
+def pytest_collection_modifyitems(config, items):
+    """
+    Deselect benchmark tests unless they were asked for.
+    
+    Benchmarks run with --benchmark-only (pytest-benchmark) or an explicit
+    -m expression; a plain run leaves them out, with or without the
+    plugin installed.
+    """
+    if config.getoption('benchmark_only', False):
+        return
+    if config.getoption('markexpr'):
+        return
+    
+    selected, deselected = [], []
+    for item in items:
+        if item.get_closest_marker('benchmark'):
+            deselected.append(item)
+        else:
+            selected.append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
     """
     Create application instance for testing.
     
+    Each test session (one per xdist worker) gets its own database file
+    and its own home directory for template files, so parallel workers
+    share no state.
+    
+    Parameters
+    ----------
+    tmp_path_factory : TempPathFactory
+        Session-scoped temporary directory factory
+    
     Returns
     -------
     Flask
@@ -24,42 +66,126 @@ def app():
     """
     # Create temporary database
     db_fd, db_path = tempfile.mkstemp()
+    home = tmp_path_factory.mktemp('home')
     
-    app = create_app()
-    app.config.update({
-        'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
-        'WTF_CSRF_ENABLED': False,
-        'SECRET_KEY': 'test-secret-key'
-    })
-    
-    with app.app_context():
-        db.create_all()
-        init_default_data()
+    # Point the user templates directory at the temporary home
+    environ = {'HOME': str(home), 'USERPROFILE': str(home)}
+    with mock.patch.dict(os.environ, environ):
+        get_user_templates_dir.cache_clear()
+        
+        # Applied before the engine and logging are set up, so no SQL echo
+        # and no log file writer run during tests
+        app = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+            'SQLALCHEMY_ECHO': False,
+            'WTF_CSRF_ENABLED': False,
+            'SECRET_KEY': 'test-secret-key'
+        })
+        logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
+        
+        with app.app_context():
+            _enable_sqlite_savepoints(db.engine)
+            db.create_all()
+            init_default_data()
+        
         yield app
         
         # Cleanup
-        db.drop_all()
+        with app.app_context():
+            db.drop_all()
+            db.engine.dispose()
         os.close(db_fd)
         os.unlink(db_path)
+        get_user_templates_dir.cache_clear()
 
 
-@pytest.fixture
+def _enable_sqlite_savepoints(engine) -> None:
+    """
+    Let SQLAlchemy control transactions on pysqlite connections.
+    
+    pysqlite begins transactions lazily and does not treat SAVEPOINT as
+    nested, so a released savepoint would commit the outer transaction.
+    Emitting BEGIN ourselves makes the per-test rollback hold.
+    """
+    @event.listens_for(engine, 'connect')
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, 'begin')
+    def _emit_begin(connection):
+        connection.exec_driver_sql('BEGIN')
+    
+    # Drop any connection opened before the listeners existed
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def db_session(app):
+    """
+    Run each test in a transaction that is rolled back afterwards.
+    
+    An application context stays pushed for the whole test, so fixtures,
+    test code and test client requests share one session.
+    
+    Parameters
+    ----------
+    app : Flask
+        Test application
+    
+    Returns
+    -------
+    scoped_session
+        Session bound to the test's connection
+    """
+    with app.app_context():
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        
+        # One session per test, whichever app contexts the test pushes.
+        # Objects are not expired on commit, so reading fixture attributes
+        # such as sample_template.id doesn't reload the row.
+        app_session = db.session
+        db.session = scoped_session(
+            sessionmaker(
+                bind=connection,
+                join_transaction_mode='create_savepoint',
+                expire_on_commit=False,
+                query_cls=db.Query
+            ),
+            scopefunc=lambda: None
+        )
+        
+        yield db.session
+        
+        db.session.remove()
+        db.session = app_session
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope='session')
 def client(app):
     """
     Create test client.
     
+    One throwaway request is made up front so URL map binding, session
+    setup and the first query are paid here rather than in whichever
+    test happens to run first.
+    
     Parameters
     ----------
     app : Flask
         Test application
-        
+    
     Returns
     -------
     FlaskClient
         Test client for making requests
     """
-    return app.test_client()
+    client = app.test_client()
+    client.get('/api/templates')
+    return client
 
 
 @pytest.fixture
@@ -71,7 +197,7 @@ def runner(app):
     ----------
     app : Flask
         Test application
-        
+    
     Returns
     -------
     FlaskCliRunner
@@ -81,49 +207,72 @@ def runner(app):
 
 
 @pytest.fixture
-def sample_template(app):
+def sample_template(db_session):
     """
     Create sample template for testing.
     
     Parameters
     ----------
-    app : Flask
-        Test application
-        
+    db_session : scoped_session
+        Session of the current test
+    
     Returns
     -------
     Template
         Sample template instance
     """
-    with app.app_context():
-        template = Template(
-            title='Test Template',
-            content='# Test\n\nThis is a **test** template.',
-            description='A test template for unit testing',
-            is_favorite=True
-        )
-        db.session.add(template)
-        db.session.commit()
-        return template
+    template = Template(
+        title='Test Template',
+        content='# Test\n\nThis is a **test** template.',
+        description='A test template for unit testing',
+        is_favorite=True
+    )
+    db_session.add(template)
+    db_session.commit()
+    return template
 
 
 @pytest.fixture
-def sample_folder(app):
+def sample_folder(db_session):
     """
     Create sample folder for testing.
     
     Parameters
     ----------
-    app : Flask
-        Test application
-        
+    db_session : scoped_session
+        Session of the current test
+    
     Returns
     -------
     Folder
         Sample folder instance
     """
-    with app.app_context():
-        folder = Folder(name='Test Folder')
-        db.session.add(folder)
-        db.session.commit()
-        return folder
\ No newline at end of file
+    folder = Folder(name='Test Folder')
+    db_session.add(folder)
+    db_session.commit()
+    return folder
+
+
+@pytest.fixture
+def many_templates(db_session):
+    """
+    Seed 1000 templates, alternating favorites, in one executemany.
+    
+    The ORM bulk INSERT skips mapper events, so content_length is given
+    explicitly rather than left to the before_insert listener.
+    
+    Parameters
+    ----------
+    db_session : scoped_session
+        Session of the current test
+    """
+    db_session.execute(insert(Template), [
+        {
+            'title': f't{i}',
+            'content': 'x',
+            'content_length': 1,
+            'is_favorite': i % 2 == 0
+        }
+        for i in range(1000)
+    ])
+    db_session.commit()
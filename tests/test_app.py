@@ -0,0 +1,24 @@
+"""
+Unit tests for the application factory.
+
+This module tests how create_app configures extensions for different
+settings.
+"""
+
+import pytest
+from app import create_app, db
+
+
+class TestCreateApp:
+    """Test cases for create_app."""
+    
+    @pytest.mark.parametrize('uri', ['sqlite://', 'sqlite:///:memory:'])
+    def test_in_memory_sqlite(self, uri):
+        """Test in-memory SQLite URIs build an engine."""
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': uri})
+        
+        with app.app_context():
+            engine = db.engine
+            with engine.connect() as connection:
+                assert connection.exec_driver_sql('SELECT 1').scalar() == 1
+            engine.dispose()
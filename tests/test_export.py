@@ -78,6 +78,22 @@ class TestExportUtilities:
         assert "Google (https://google.com)" in text
         assert "GitHub (https://github.com)" in text
     
+    def test_markdown_to_text_code_blocks(self):
+        """Test converting fenced code blocks to indented text."""
+        markdown = "Intro\n\n```python\nx = 1\ny = 2\n```\n\nOutro"
+        text = markdown_to_text(markdown)
+        
+        assert "```" not in text
+        assert "    x = 1\n    y = 2" in text
+        assert "Outro" in text
+    
+    def test_markdown_to_text_plain(self):
+        """Test that plain text only has its blank lines tidied."""
+        plain = "  Just some words.\n\n\n\nNo markup here.  "
+        text = markdown_to_text(plain)
+        
+        assert text == "Just some words.\n\nNo markup here."
+    
     def test_sanitize_filename_invalid_chars(self):
         """Test filename sanitization with invalid characters."""
         filename = 'file<>:"/\\|?*name'
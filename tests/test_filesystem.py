@@ -0,0 +1,91 @@
+"""
+Unit tests for file system utilities.
+
+This module tests writing templates to the user's templates directory
+and syncing the database to it.
+"""
+
+from app import db
+from app.models import Template
+from app.utils.filesystem import (
+    SYNC_BATCH_SIZE, get_folder_structure, get_template_file_path,
+    get_user_templates_dir, sync_database_to_filesystem, write_template_files
+)
+
+
+class TestWriteTemplateFiles:
+    """Test cases for batched template file writes."""
+    
+    def test_duplicate_paths_last_wins(self, tmp_path):
+        """Test templates sharing a path leave the last body intact."""
+        file_path = tmp_path / 'Dup.md'
+        long_body = 'x' * 200_000
+        # Alternate long and short bodies, ending on a short one
+        files = [
+            (file_path, 'Dup', long_body if i % 2 else 'short')
+            for i in range(401)
+        ]
+        
+        write_template_files(files, max_workers=16)
+        
+        content = file_path.read_text(encoding='utf-8')
+        assert content.endswith('---\n\nshort')
+    
+    def test_streamed_files_written_in_windows(self, tmp_path):
+        """Test files are pulled from the iterable one window at a time."""
+        def files():
+            for i in range(SYNC_BATCH_SIZE * 3):
+                if i and i % SYNC_BATCH_SIZE == 0:
+                    # The previous window is on disk before more are read
+                    assert (tmp_path / f'{i - 1}.md').exists()
+                yield tmp_path / f'{i}.md', str(i), 'body'
+        
+        write_template_files(files(), max_workers=16)
+        
+        assert len(list(tmp_path.iterdir())) == SYNC_BATCH_SIZE * 3
+    
+    def test_sanitized_collision_last_wins(self, app):
+        """Test titles sanitized to the same name keep the newest body."""
+        db.session.add_all([
+            Template(title='a/b', content='first'),
+            Template(title='a_b', content='second'),
+        ])
+        db.session.commit()
+        
+        sync_database_to_filesystem()
+        
+        file_path = get_template_file_path('a_b', get_user_templates_dir())
+        content = file_path.read_text(encoding='utf-8')
+        assert content.endswith('second')
+
+
+class TestGetFolderStructure:
+    """Test cases for reading the templates directory tree."""
+    
+    def test_symlink_loop_not_followed(self, app):
+        """Test a directory symlink pointing back up is not descended."""
+        templates_dir = get_user_templates_dir()
+        folder = templates_dir / 'Looped'
+        folder.mkdir(exist_ok=True)
+        (folder / 'loop').symlink_to(templates_dir, target_is_directory=True)
+        try:
+            structure = get_folder_structure()
+        finally:
+            (folder / 'loop').unlink()
+            folder.rmdir()
+        
+        looped = next(f for f in structure['folders'] if f['name'] == 'Looped')
+        assert looped['folders'] == []
+    
+    def test_missing_root(self, app):
+        """Test a removed templates directory gives an empty structure."""
+        templates_dir = get_user_templates_dir()
+        moved = templates_dir.with_name('templates_moved')
+        templates_dir.rename(moved)
+        try:
+            structure = get_folder_structure()
+        finally:
+            moved.rename(templates_dir)
+        
+        assert structure['folders'] == []
+        assert structure['templates'] == []
@@ -5,8 +5,15 @@ This module tests the database models including their methods,
 relationships, and data validation.
 """
 
+import sqlite3
+import subprocess
+import sys
 from datetime import datetime
-from app import db
+from pathlib import Path
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import scoped_session, sessionmaker
+from app import create_app, db, init_db
 from app.models import Template, Folder
 
 
@@ -61,6 +68,83 @@ class TestTemplate:
             # Search empty query
             results = Template.search('')
             assert results == []
+            
+            # Single-character queries are not run
+            results = Template.search('T')
+            assert results == []
+    
+    def test_template_search_prefix_match(self, app):
+        """Test search matches word prefixes, not arbitrary substrings."""
+        db.session.add(Template(title='Greeting', content='hello world'))
+        db.session.commit()
+        
+        assert [t.title for t in Template.search('hel wor')] == ['Greeting']
+        assert Template.search('ello') == []
+    
+    def test_template_search_ranked(self, app):
+        """Test search results come back in relevance order."""
+        # The weaker match is newer, so date order would list it first
+        db.session.add(Template(title='Kiwi', content='kiwi kiwi kiwi'))
+        db.session.commit()
+        db.session.add(Template(
+            title='Fruit salad', content='apple pear plum ' * 30 + 'kiwi'
+        ))
+        db.session.commit()
+        
+        results = Template.search('kiwi')
+        assert [t.title for t in results] == ['Kiwi', 'Fruit salad']
+    
+    def test_template_search_follows_update(self, app):
+        """Test updating a template re-indexes it."""
+        template = Template(title='Draft', content='zebra crossing')
+        db.session.add(template)
+        db.session.commit()
+        assert Template.search('zebra') == [template]
+        
+        template.content = 'pelican crossing'
+        db.session.commit()
+        
+        assert Template.search('zebra') == []
+        assert Template.search('pelican') == [template]
+    
+    def test_template_search_follows_delete(self, app):
+        """Test deleting a template removes it from the index."""
+        template = Template(title='Ephemeral', content='quokka')
+        db.session.add(template)
+        db.session.commit()
+        assert Template.search('quokka') == [template]
+        
+        db.session.delete(template)
+        db.session.commit()
+        
+        assert Template.search('quokka') == []
+    
+    def test_template_search_like_fallback(self, app):
+        """Test queries without word characters use a substring scan."""
+        db.session.add(Template(title='Tips', content='Modern C++ idioms'))
+        db.session.commit()
+        
+        assert [t.title for t in Template.search('++')] == ['Tips']
+    
+    def test_template_search_like_fresh_process(self, tmp_path):
+        """Test the LIKE path works before any other ORM query has run."""
+        # Mappers are configured once per process, so this needs a new one
+        script = (
+            'import sys\n'
+            'from app import create_app, init_db\n'
+            'from app.models import Template\n'
+            'app = create_app({"TESTING": True,\n'
+            '    "SQLALCHEMY_DATABASE_URI": "sqlite:///" + sys.argv[1]})\n'
+            'init_db(app)\n'
+            'with app.app_context():\n'
+            '    assert Template.search("++") == []\n'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script, str(tmp_path / 'fresh.db')],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
     
     def test_template_favorites(self, app, sample_template):
         """Test getting favorite templates."""
@@ -136,4 +220,123 @@ class TestFolder:
             db.session.commit()
             
             assert template.folder == sample_folder
-            assert template in sample_folder.templates
\ No newline at end of file
+            assert template in sample_folder.templates
+
+
+@pytest.fixture
+def old_schema_app(tmp_path):
+    """
+    Create an application on a database with the original schema.
+    
+    The database predates content_length, the full-text index and the
+    listing indexes; init_db is left to the test.
+    
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary directory for the database file
+    
+    Returns
+    -------
+    Flask
+        Application bound to the old database
+    """
+    db_path = tmp_path / 'old.db'
+    connection = sqlite3.connect(db_path)
+    connection.executescript("""
+        CREATE TABLE folders (
+            id INTEGER PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            parent_id INTEGER REFERENCES folders (id),
+            created_at DATETIME NOT NULL,
+            updated_at DATETIME NOT NULL
+        );
+        CREATE TABLE templates (
+            id INTEGER PRIMARY KEY,
+            title VARCHAR(200) NOT NULL,
+            content TEXT NOT NULL,
+            description VARCHAR(500),
+            folder_id INTEGER REFERENCES folders (id),
+            is_favorite BOOLEAN NOT NULL,
+            created_at DATETIME NOT NULL,
+            updated_at DATETIME NOT NULL
+        );
+        INSERT INTO templates (
+            title, content, is_favorite, created_at, updated_at
+        ) VALUES (
+            'Old', 'héllo world', 0, '2024-01-01 00:00:00',
+            '2024-01-01 00:00:00'
+        );
+    """)
+    connection.close()
+    
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}'
+    })
+    yield app
+    
+    with app.app_context():
+        db.engine.dispose()
+
+
+class TestSchemaUpgrade:
+    """Test cases for opening databases created by earlier versions."""
+    
+    def test_init_db_adds_content_length(self, old_schema_app):
+        """Test init_db adds and backfills content_length."""
+        init_db(old_schema_app)
+        
+        with old_schema_app.app_context():
+            columns = {
+                column['name']
+                for column in inspect(db.engine).get_columns('templates')
+            }
+            with db.engine.connect() as connection:
+                length = connection.execute(text(
+                    "SELECT content_length FROM templates "
+                    "WHERE title = 'Old'"
+                )).scalar_one()
+        
+        assert 'content_length' in columns
+        assert length == len('héllo world')
+    
+    def test_init_db_adds_listing_indexes(self, old_schema_app):
+        """Test init_db adds the indexes behind the listing queries."""
+        init_db(old_schema_app)
+        
+        with old_schema_app.app_context():
+            inspector = inspect(db.engine)
+            indexes = {
+                index['name']
+                for table in ('folders', 'templates')
+                for index in inspector.get_indexes(table)
+            }
+        
+        assert indexes >= {
+            'ix_folders_parent_id', 'ix_templates_updated_at',
+            'ix_templates_folder_id', 'ix_templates_is_favorite'
+        }
+    
+    def test_init_db_adds_search_index(self, old_schema_app, monkeypatch):
+        """Test search on an upgraded database goes through the index."""
+        init_db(old_schema_app)
+        
+        with old_schema_app.app_context():
+            # Query the upgraded database rather than the test database
+            monkeypatch.setattr(db, 'session', scoped_session(
+                sessionmaker(bind=db.engine, query_cls=db.Query),
+                scopefunc=lambda: None
+            ))
+            db.session.add(Template(title='New', content='pelican crossing'))
+            db.session.commit()
+            
+            old_ids = Template._fts_search_ids('world')
+            # Word-prefix matching only happens through the index
+            mid_word = Template.search('llo')
+            new_titles = [t.title for t in Template.search('pelic')]
+            db.session.remove()
+        
+        assert old_ids == [1]
+        assert mid_word == []
+        assert new_titles == ['New']
\ No newline at end of file
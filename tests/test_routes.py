@@ -5,7 +5,73 @@ This module tests all HTTP endpoints including template management,
 folder operations, and export functionality.
 """
 
-import json
+import re
+import orjson
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models import Folder, Template
+from app.routes import clear_listing_caches
+
+_JSON = 'application/json'
+
+# Expected HTTP status codes
+OK, CREATED, BAD_REQUEST, NOT_FOUND = 200, 201, 400, 404
+
+# Fixed request bodies, serialized once at import
+_NEW_TEMPLATE_PAYLOAD = orjson.dumps({
+    'title': 'New Test Template',
+    'content': 'New test content',
+    'description': 'Created via API'
+})
+_MISSING_TITLE_PAYLOAD = orjson.dumps({'content': 'Content without title'})
+_UPDATE_TEMPLATE_PAYLOAD = orjson.dumps({
+    'title': 'Updated Template Title',
+    'content': 'Updated content',
+    'is_favorite': False
+})
+_NEW_FOLDER_PAYLOAD = orjson.dumps({'name': 'New Test Folder'})
+_MISSING_NAME_PAYLOAD = orjson.dumps({})
+
+
+def post_json(client, url, payload):
+    """POST a JSON body, given as a dict or pre-serialized bytes."""
+    return client.post(url, **_json_body(payload))
+
+
+def put_json(client, url, payload):
+    """PUT a JSON body, given as a dict or pre-serialized bytes."""
+    return client.put(url, **_json_body(payload))
+
+
+def _json_body(payload):
+    """
+    Get request keywords for a JSON body.
+    
+    Dicts go through the client's json= argument, which serializes with
+    the app's orjson provider; pre-serialized bytes are sent as-is.
+    """
+    if isinstance(payload, bytes):
+        return {'data': payload, 'content_type': _JSON}
+    return {'json': payload}
+
+
+def ok(response, code=OK):
+    """
+    Assert a successful response and return its data payload.
+    
+    Responses that carry only a message (e.g. deletes) give None.
+    """
+    body = response.get_json()
+    assert (response.status_code, body['status']) == (code, 'success')
+    return body.get('data')
+
+
+def err(response, code):
+    """Assert an error response and return its body."""
+    body = response.get_json()
+    assert (response.status_code, body['status']) == (code, 'error')
+    return body
 
 
 class TestRoutes:
@@ -14,165 +80,165 @@ class TestRoutes:
     def test_index_route(self, client):
         """Test main index page."""
         response = client.get('/')
-        assert response.status_code == 200
-        assert b'Prompt Editor v2.0' in response.data
+        assert response.status_code == OK
+        # The page title sits in <head>; don't scan the whole document
+        assert response.data.find(b'Prompt Editor v2.0', 0, 4096) != -1
+    
+    @pytest.mark.parametrize('endpoint, expect_min, expect_fields', [
+        ('/api/templates', 1, {}),
+        ('/api/folders', 1, {}),
+        ('/api/templates?search=test', 1, {}),
+        ('/api/templates?favorites=true', 1, {'is_favorite': True}),
+    ])
+    def test_list_endpoint(
+        self, client, sample_template, sample_folder,
+        endpoint, expect_min, expect_fields
+    ):
+        """Test listing endpoints return enough matching items."""
+        items = ok(client.get(endpoint))
+        assert len(items) >= expect_min
+        # Every returned item should match the filter
+        assert all(expect_fields.items() <= item.items() for item in items)
     
-    def test_get_templates_api(self, client, sample_template):
-        """Test getting templates via API."""
-        response = client.get('/api/templates')
-        assert response.status_code == 200
+    @pytest.mark.parametrize('endpoint', [
+        '/api/templates/99999',
+        '/api/folders/99999/templates',
+    ])
+    def test_nonexistent_resource(self, client, endpoint):
+        """Test getting nonexistent resources returns 404."""
+        err(client.get(endpoint), NOT_FOUND)
+    
+    def test_get_templates_summary_paginated(self, client):
+        """Test summary listing omits content and honours limit."""
+        data = ok(client.get('/api/templates?fields=summary&limit=1'))
+        assert len(data) == 1
+        summary = data[0]
+        assert 'content' not in summary
+        assert 'content_length' in summary
+    
+    @pytest.mark.parametrize('query', [
+        'limit=-1', 'offset=-1', 'search=test&offset=-1',
+    ])
+    def test_get_templates_negative_paging(self, client, query):
+        """Test negative limit or offset is rejected."""
+        err(client.get(f'/api/templates?{query}'), BAD_REQUEST)
+    
+    @pytest.mark.parametrize('query', ['limit=0', 'search=test&limit=0'])
+    def test_get_templates_zero_limit(self, client, sample_template, query):
+        """Test a zero limit returns no templates."""
+        assert ok(client.get(f'/api/templates?{query}')) == []
+    
+    def test_search_summary_matches_full_search(self, client, db_session):
+        """Test summary search keeps the ranked order and paging."""
+        db_session.add_all([
+            Template(title='Kiwi', content='kiwi kiwi kiwi'),
+            Template(title='Fruit', content='apple pear plum ' * 30 + 'kiwi'),
+            Template(title='Tart', content='kiwi tart'),
+        ])
+        db_session.commit()
         
-        data = json.loads(response.data)
-        assert data['status'] == 'success'
-        assert 'data' in data
-        assert len(data['data']) >= 1
+        full = ok(client.get('/api/templates?search=kiwi'))
+        summary = ok(client.get('/api/templates?search=kiwi&fields=summary'))
+        page = ok(client.get(
+            '/api/templates?search=kiwi&fields=summary&offset=1&limit=1'
+        ))
+        
+        assert [t['id'] for t in summary] == [t['id'] for t in full]
+        assert all('content' not in t for t in summary)
+        assert [t['id'] for t in page] == [full[1]['id']]
     
-    def test_create_template_api(self, client):
-        """Test creating template via API."""
-        template_data = {
-            'title': 'New Test Template',
-            'content': 'New test content',
-            'description': 'Created via API'
-        }
+    def test_search_summary_skips_content(self, client, sample_template):
+        """Test summary search never selects the content column."""
+        # A cached listing would skip the queries under test
+        clear_listing_caches()
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
         
-        response = client.post(
-            '/api/templates',
-            data=json.dumps(template_data),
-            content_type='application/json'
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            ok(client.get('/api/templates?search=test&fields=summary'))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        
+        assert statements
+        assert not any(
+            re.search(r'templates\.content\b(?!_)', statement)
+            for statement in statements
         )
+    
+    def test_get_templates_reflects_changes(self, client):
+        """Test a repeated listing picks up newly created templates."""
+        before = ok(client.get('/api/templates'))
+        
+        ok(
+            post_json(client, '/api/templates', _NEW_TEMPLATE_PAYLOAD),
+            CREATED
+        )
+        
+        after = ok(client.get('/api/templates'))
+        assert len(after) == len(before) + 1
+        assert after[0]['title'] == 'New Test Template'
+    
+    def test_create_template_api(self, client):
+        """Test creating template via API."""
+        response = post_json(client, '/api/templates', _NEW_TEMPLATE_PAYLOAD)
         
-        assert response.status_code == 201
-        data = json.loads(response.data)
-        assert data['status'] == 'success'
-        assert data['data']['title'] == 'New Test Template'
+        template = ok(response, CREATED)
+        assert template['title'] == 'New Test Template'
     
     def test_create_template_missing_title(self, client):
         """Test creating template without title fails."""
-        template_data = {
-            'content': 'Content without title'
-        }
-        
-        response = client.post(
-            '/api/templates',
-            data=json.dumps(template_data),
-            content_type='application/json'
-        )
+        response = post_json(client, '/api/templates', _MISSING_TITLE_PAYLOAD)
         
-        assert response.status_code == 400
-        data = json.loads(response.data)
-        assert data['status'] == 'error'
+        err(response, BAD_REQUEST)
     
     def test_get_template_by_id(self, client, sample_template):
         """Test getting specific template by ID."""
-        response = client.get(f'/api/templates/{sample_template.id}')
-        assert response.status_code == 200
-        
-        data = json.loads(response.data)
-        assert data['status'] == 'success'
-        assert data['data']['id'] == sample_template.id
-        assert data['data']['title'] == sample_template.title
-    
-    def test_get_nonexistent_template(self, client):
-        """Test getting nonexistent template returns 404."""
-        response = client.get('/api/templates/99999')
-        assert response.status_code == 404
+        url = f'/api/templates/{sample_template.id}'
         
-        data = json.loads(response.data)
-        assert data['status'] == 'error'
+        template = ok(client.get(url))
+        assert template['id'] == sample_template.id
+        assert template['title'] == sample_template.title
     
     def test_update_template(self, client, sample_template):
         """Test updating template via API."""
-        update_data = {
-            'title': 'Updated Template Title',
-            'content': 'Updated content',
-            'is_favorite': False
-        }
-        
-        response = client.put(
-            f'/api/templates/{sample_template.id}',
-            data=json.dumps(update_data),
-            content_type='application/json'
-        )
+        url = f'/api/templates/{sample_template.id}'
         
-        assert response.status_code == 200
-        data = json.loads(response.data)
-        assert data['status'] == 'success'
-        assert data['data']['title'] == 'Updated Template Title'
-        assert data['data']['is_favorite'] is False
+        template = ok(put_json(client, url, _UPDATE_TEMPLATE_PAYLOAD))
+        assert template['title'] == 'Updated Template Title'
+        assert template['is_favorite'] is False
     
     def test_delete_template(self, client, sample_template):
         """Test deleting template via API."""
         template_id = sample_template.id
+        url = f'/api/templates/{template_id}'
         
-        response = client.delete(f'/api/templates/{template_id}')
-        assert response.status_code == 200
-        
-        data = json.loads(response.data)
-        assert data['status'] == 'success'
+        ok(client.delete(url))
         
         # Verify template is deleted
-        response = client.get(f'/api/templates/{template_id}')
-        assert response.status_code == 404
+        assert db.session.get(Template, template_id) is None
     
-    def test_get_folders_api(self, client, sample_folder):
-        """Test getting folders via API."""
-        response = client.get('/api/folders')
-        assert response.status_code == 200
-        
-        data = json.loads(response.data)
-        assert data['status'] == 'success'
-        assert len(data['data']) >= 1
+    def test_get_folders_tree(self, client):
+        """Test getting folders as a nested tree."""
+        folders = ok(client.get('/api/folders?tree=true'))
+        root = next(f for f in folders if f['name'] == 'Root')
+        assert root['depth'] == 0
+        assert len(root['children']) == root['children_count']
     
     def test_create_folder_api(self, client):
         """Test creating folder via API."""
-        folder_data = {
-            'name': 'New Test Folder'
-        }
+        response = post_json(client, '/api/folders', _NEW_FOLDER_PAYLOAD)
         
-        response = client.post(
-            '/api/folders',
-            data=json.dumps(folder_data),
-            content_type='application/json'
-        )
-        
-        assert response.status_code == 201
-        data = json.loads(response.data)
-        assert data['status'] == 'success'
-        assert data['data']['name'] == 'New Test Folder'
+        folder = ok(response, CREATED)
+        assert folder['name'] == 'New Test Folder'
     
     def test_create_folder_missing_name(self, client):
         """Test creating folder without name fails."""
-        folder_data = {}
-        
-        response = client.post(
-            '/api/folders',
-            data=json.dumps(folder_data),
-            content_type='application/json'
-        )
-        
-        assert response.status_code == 400
-        data = json.loads(response.data)
-        assert data['status'] == 'error'
-    
-    def test_search_templates(self, client, sample_template):
-        """Test searching templates."""
-        response = client.get('/api/templates?search=test')
-        assert response.status_code == 200
-        
-        data = json.loads(response.data)
-        assert data['status'] == 'success'
-        assert len(data['data']) >= 1
-    
-    def test_filter_favorites(self, client, sample_template):
-        """Test filtering favorite templates."""
-        response = client.get('/api/templates?favorites=true')
-        assert response.status_code == 200
+        response = post_json(client, '/api/folders', _MISSING_NAME_PAYLOAD)
         
-        data = json.loads(response.data)
-        assert data['status'] == 'success'
-        # All returned templates should be favorites
-        for template in data['data']:
-            assert template['is_favorite'] is True
+        err(response, BAD_REQUEST)
     
     def test_filter_by_folder(self, client, sample_folder):
         """Test filtering templates by folder."""
@@ -183,20 +249,39 @@ class TestRoutes:
             'folder_id': sample_folder.id
         }
         
-        response = client.post(
-            '/api/templates',
-            data=json.dumps(template_data),
-            content_type='application/json'
-        )
-        assert response.status_code == 201
+        ok(post_json(client, '/api/templates', template_data), CREATED)
         
         # Filter by folder
-        response = client.get(f'/api/templates?folder_id={sample_folder.id}')
-        assert response.status_code == 200
-        
-        data = json.loads(response.data)
-        assert data['status'] == 'success'
-        assert len(data['data']) >= 1
+        folder_id = sample_folder.id
+        templates = ok(client.get(f'/api/templates?folder_id={folder_id}'))
+        assert len(templates) >= 1
         # All returned templates should be in the folder
-        for template in data['data']:
-            assert template['folder_id'] == sample_folder.id
\ No newline at end of file
+        assert all(t['folder_id'] == folder_id for t in templates)
+    
+    def test_move_folder_under_descendant_rejected(self, client, db_session):
+        """Test moving a folder under its own grandchild fails."""
+        root = Folder(name='Cycle Root')
+        child = Folder(name='Cycle Child', parent=root)
+        grandchild = Folder(name='Cycle Grandchild', parent=child)
+        db_session.add_all([root, child, grandchild])
+        db_session.commit()
+        
+        response = put_json(
+            client, f'/api/folders/{root.id}', {'parent_id': grandchild.id}
+        )
+        
+        err(response, BAD_REQUEST)
+        assert db.session.get(Folder, root.id).parent_id is None
+    
+    def test_move_folder(self, client, db_session):
+        """Test moving a folder under a non-descendant succeeds."""
+        root = Folder(name='Move Root')
+        child = Folder(name='Move Child', parent=root)
+        other = Folder(name='Move Target')
+        db_session.add_all([root, child, other])
+        db_session.commit()
+        
+        folder = ok(put_json(
+            client, f'/api/folders/{root.id}', {'parent_id': other.id}
+        ))
+        assert folder['parent_id'] == other.id
\ No newline at end of file
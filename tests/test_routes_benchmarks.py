@@ -0,0 +1,46 @@
+"""
+Benchmarks for Flask routes and API endpoints.
+
+This module times the template listing and creation endpoints so that
+serialization and query changes have a measurable baseline. It needs
+the pytest-benchmark plugin and is skipped without it. Plain `pytest`
+runs deselect these tests (see conftest.py); run them with
+`pytest --benchmark-only`.
+"""
+
+import pytest
+from app.routes import clear_listing_caches
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.benchmark
+
+_NEW_TEMPLATE = {
+    'title': 'Benchmark Template',
+    'content': 'Benchmark content',
+    'description': 'Created by the benchmark suite'
+}
+
+
+class TestRouteBenchmarks:
+    """Benchmarks for main routes."""
+    
+    def test_list_templates_perf(self, benchmark, client, many_templates):
+        """Time listing templates, served from the listing cache."""
+        response = benchmark(client.get, '/api/templates')
+        assert response.status_code == 200
+    
+    def test_list_templates_uncached_perf(
+        self, benchmark, client, many_templates
+    ):
+        """Time listing templates with the listing cache cleared."""
+        response = benchmark.pedantic(
+            client.get, args=('/api/templates',),
+            setup=clear_listing_caches, rounds=20
+        )
+        assert response.status_code == 200
+    
+    def test_create_template_perf(self, benchmark, client):
+        """Time creating a template."""
+        response = benchmark(client.post, '/api/templates', json=_NEW_TEMPLATE)
+        assert response.status_code == 201